@@ -20,6 +20,7 @@ ensure_packages([
     {"package": "selenium", "module": "selenium"},
     {"package": "webdriver-manager", "module": "webdriver_manager"},
     {"package": "selenium-stealth", "module": "selenium_stealth"},
+    {"package": "lxml", "module": "lxml"},
 ])
 
 from selenium import webdriver
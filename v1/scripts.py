@@ -45,7 +45,7 @@ def linkedin_login(driver: webdriver.Chrome, username: str= "cubicfammy@gmail.co
 
 def get_jobs_page_html(driver: webdriver.Chrome):
     html = driver.page_source
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = BeautifulSoup(html, 'lxml')
     content = soup.find('main',id="main")
     return content
 
@@ -1,86 +1,251 @@
-import time
+import gzip
+import hashlib
+import io
 import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from selenium import webdriver
 from selenium_stealth import stealth
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
-from scripts import get_jobs_page_html, search_jobs, linkedin_login
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import WebDriverException
+from scripts import get_jobs_page_html, search_jobs, linkedin_login, load_cookies, save_cookies, is_logged_in, get_chromedriver_path, lock_profile_dir, wait, find_chrome_binary, validate_credentials, jobs_search_url
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Check if environment variables are set
-if not os.getenv("LINKEDIN_USERNAME") or not os.getenv("LINKEDIN_PASSWORD"):
-    print("Error: Please configure your LinkedIn credentials in the .env file")
+# Check the credentials are set and well-formed before paying for driver resolution and Chrome startup
+credentials_error = validate_credentials(os.getenv("LINKEDIN_USERNAME"), os.getenv("LINKEDIN_PASSWORD"))
+if credentials_error:
+    print(f"Error: {credentials_error}")
     print("Make sure to create a .env file in the v2 directory with:")
     print("LINKEDIN_USERNAME=your_email@example.com")
     print("LINKEDIN_PASSWORD=your_password")
     exit(1)
 
-options = Options()
-options.headless = False
-options.add_argument("--disable-blink-features=AutomationControlled")
-# Common user-agent; override if needed
-options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.45 Safari/537.36")
-
-# Helpful flags for Linux / container / headless environments
-# - --no-sandbox and --disable-dev-shm-usage are commonly required when running in containers
-# - --headless=new uses the new headless mode in newer Chrome; fall back to --headless if needed
-if os.getenv("HEADLESS", "0") in ("1", "true", "True"):
-    # Chrome new headless mode if supported
-    try:
-        options.add_argument("--headless=new")
-    except Exception:
-        options.add_argument("--headless")
-    options.add_argument("--disable-gpu")
-
-options.add_argument("--no-sandbox")
-options.add_argument("--disable-dev-shm-usage")
-options.add_argument("--disable-extensions")
-options.add_argument("--disable-background-networking")
-options.add_argument("--disable-default-apps")
-
-# Allow specifying custom Chrome/Chromium binary via env var (useful in CI / custom installs)
-chrome_bin = os.getenv("CHROME_BIN")
-if chrome_bin:
-    options.binary_location = chrome_bin
-
-# Create a Service with a chromedriver verbose log path to help debug session failures
-service = Service(ChromeDriverManager().install(), log_path="chromedriver.log")
-driver = webdriver.Chrome(service=service, options=options)
-stealth(driver,
-        languages=["en-US", "en"],
-        vendor="Google Inc.",
-        platform="Win32",
-        webgl_vendor="Intel Inc.",
-        renderer="Intel Iris OpenGL Engine",
-        fix_hairline=True,
-)
-# opening the site first to set domain
-driver.get("https://www.linkedin.com/login")  
-
-linkedin_login(driver)
-time.sleep(5)  # wait for login to complete
-
-
-# Finding jobs on LinkedIn
-search_jobs(driver, keyword="Data Scientist", location="New York, United States")
-print("Job Found")
-time.sleep(10)
-
-# Getting page content to scrape jobs later
-print("Extracting content of the page...")
-html_content = str(get_jobs_page_html(driver))
-print("Extractition completed")
-
-# Save the HTML content to a file for later scraping
-with open("data/jobs_page.html", "w", encoding="utf-8") as f:
-    f.write(html_content)
-time.sleep(2)
-
-input()
-driver.quit()
-# Now you are logged in using saved cookies, proceed to job search and scraping
+# A CHROME_BIN pointing nowhere is definitely wrong; otherwise chromedriver may still find Chrome on its own
+if os.getenv("CHROME_BIN") and not os.path.exists(os.getenv("CHROME_BIN")):
+    print(f"Error: CHROME_BIN is set to {os.getenv('CHROME_BIN')}, which does not exist")
+    exit(1)
+if not find_chrome_binary():
+    print("Warning: Could not find Google Chrome or Chromium; leaving it to chromedriver to locate it")
+    print("If startup fails, install Chrome or set CHROME_BIN in the .env file to the path of your Chrome/Chromium binary")
+
+# (keyword, location) pairs to scrape; each one runs in its own browser
+SEARCHES = [
+    ("Data Scientist", "New York, United States"),
+]
+# Drop repeated pairs (ignoring case and surrounding spaces) so each search runs once
+unique_searches = {}
+for keyword, location in SEARCHES:
+    unique_searches.setdefault((keyword.strip().casefold(), (location or "").strip().casefold()), (keyword, location))
+SEARCHES = list(unique_searches.values())
+MAX_WORKERS = max(1, int(os.getenv("MAX_WORKERS", "4")))
+# Seconds between the start of consecutive workers
+WORKER_STAGGER = 3
+# Warm Chrome profiles (HTTP cache, compiled JS, cookies) reused between runs, one per worker
+PROFILE_ROOT = os.path.abspath(".chrome-profile")
+# Room for every worker plus a few concurrent runs before giving up on a free profile
+MAX_PROFILES = MAX_WORKERS + 4
+
+# Subresources the scraper never reads; blocking them cuts page-load bandwidth.
+# Patterns match the whole URL, and LinkedIn serves most images extensionless from media.licdn.com/dms/image
+BLOCKED_URLS = [
+    "*media.licdn.com/dms/image*",
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg",
+    "*.woff", "*.woff2", "*.mp4",
+    "*google-analytics*", "*doubleclick*", "*px.ads.linkedin.com*",
+]
+
+# Only one worker may fall back to the login form at a time
+login_lock = threading.Lock()
+drivers = []
+profile_locks = []
+
+
+def create_driver(driver_path):
+    options = Options()
+    options.headless = False
+    # Return from driver.get() at DOMContentLoaded instead of waiting on images/trackers;
+    # the explicit waits below cover the elements we actually use
+    options.page_load_strategy = "eager"
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    # Common user-agent; override if needed
+    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.45 Safari/537.36")
+
+    # Helpful flags for Linux / container / headless environments
+    # - --no-sandbox and --disable-dev-shm-usage are commonly required when running in containers
+    # - --headless=new uses the new headless mode in newer Chrome; fall back to --headless if needed
+    if os.getenv("HEADLESS", "0") in ("1", "true", "True"):
+        # Chrome new headless mode if supported
+        try:
+            options.add_argument("--headless=new")
+        except Exception:
+            options.add_argument("--headless")
+        options.add_argument("--disable-gpu")
+
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-background-networking")
+    options.add_argument("--disable-default-apps")
+    # Skip background services (sync, translate, crash/metrics reporting, updates) the scraper never uses
+    options.add_argument("--disable-features=Translate,BackForwardCache,AcceptCHFrame,MediaRouter,OptimizationHints")
+    options.add_argument("--disable-sync")
+    options.add_argument("--disable-client-side-phishing-detection")
+    options.add_argument("--disable-component-update")
+    options.add_argument("--metrics-recording-only")
+    options.add_argument("--no-first-run")
+    options.add_argument("--no-default-browser-check")
+    options.add_argument("--password-store=basic")
+    options.add_argument("--use-mock-keychain")
+    options.add_argument("--log-level=3")
+    options.add_experimental_option("excludeSwitches", ["enable-logging", "enable-automation"])
+    # Don't load images at all, whatever their URL looks like
+    options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+
+    # Chrome can't share a user-data-dir, so take the first profile no other worker or run holds
+    for index in range(MAX_PROFILES):
+        profile_dir = os.path.join(PROFILE_ROOT, f"worker-{index}")
+        profile_lock = lock_profile_dir(profile_dir)
+        if profile_lock:
+            break
+    else:
+        raise RuntimeError(f"All {MAX_PROFILES} Chrome profiles under {PROFILE_ROOT} are in use by other runs")
+    profile_locks.append(profile_lock)
+    options.add_argument(f"--user-data-dir={profile_dir}")
+    options.add_argument("--profile-directory=Default")
+
+    # Allow specifying custom Chrome/Chromium binary via env var (useful in CI / custom installs)
+    chrome_bin = os.getenv("CHROME_BIN")
+    if chrome_bin:
+        options.binary_location = chrome_bin
+
+    # Set CHROMEDRIVER_LOG to a file path to get a chromedriver log when debugging session failures
+    chromedriver_log = os.getenv("CHROMEDRIVER_LOG")
+    if chromedriver_log:
+        service = Service(driver_path, log_path=chromedriver_log)
+    else:
+        service = Service(driver_path)
+    driver = webdriver.Chrome(service=service, options=options)
+    # Register for cleanup right away so a failure in the setup below can't leak the browser
+    drivers.append(driver)
+    stealth(driver,
+            languages=["en-US", "en"],
+            vendor="Google Inc.",
+            platform="Win32",
+            webgl_vendor="Intel Inc.",
+            renderer="Intel Iris OpenGL Engine",
+            fix_hairline=True,
+    )
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+    return driver
+
+
+def open_session(driver, target_url):
+    # robots.txt is a tiny page that sets the cookie domain without a login redirect
+    driver.get("https://www.linkedin.com/robots.txt")
+
+    # Reuse the saved session if there is one, landing directly on the page we want to scrape
+    if os.path.exists("cookies.json"):
+        load_cookies(driver)
+    driver.get(target_url)
+
+    # LinkedIn bounces signed-out visitors to the login/authwall pages
+    if any(marker in driver.current_url for marker in ("/login", "/authwall", "/uas/")):
+        return False
+    return is_logged_in(driver)
+
+
+def cookies_mtime():
+    return os.path.getmtime("cookies.json") if os.path.exists("cookies.json") else None
+
+
+def scrape_one(driver_path, index, keyword, location):
+    # Stagger the first batch so LinkedIn doesn't see a burst of identical sessions;
+    # later searches already start one at a time as pool slots free up
+    if 0 < index < MAX_WORKERS:
+        time.sleep(index * WORKER_STAGGER + random.uniform(0, 1))
+    driver = create_driver(driver_path)
+
+    # With a valid saved session the search results are the only LinkedIn page we load
+    search_url = jobs_search_url(keyword, location)
+    seen_cookies_mtime = cookies_mtime()
+    if not open_session(driver, search_url):
+        with login_lock:
+            # Only re-check if another worker saved fresh cookies while we waited
+            if cookies_mtime() == seen_cookies_mtime or not open_session(driver, search_url):
+                driver.get("https://www.linkedin.com/login")
+                linkedin_login(driver)
+                # wait for login to complete (LinkedIn redirects to the feed)
+                wait(driver, 30).until(EC.url_contains("/feed"))
+                save_cookies(driver)
+                # Finding jobs on LinkedIn
+                search_jobs(driver, keyword=keyword, location=location)
+
+    print(f"Job Found: {keyword} in {location}")
+    wait(driver).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, "[data-view-name='job-card']"))
+    )
+
+    # Getting page content to scrape jobs later
+    return get_jobs_page_html(driver) or ""
+
+
+def write_output(output_path, html_content):
+    # Write to a temp file and swap it in so a crash never leaves a truncated dump
+    tmp_path = output_path + ".tmp"
+    # HTML compresses ~10x; a low level keeps compression cheaper than the bytes it saves writing
+    with open(tmp_path, "wb") as raw:
+        # Name the archive member after the final file, not the .tmp it is written through
+        gz = gzip.GzipFile(filename=os.path.basename(output_path), mode="wb", fileobj=raw, compresslevel=3)
+        with io.TextIOWrapper(gz, encoding="utf-8") as f:
+            f.write(html_content)
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp_path, output_path)
+
+
+try:
+    # Resolve chromedriver once here rather than racing webdriver-manager from every worker
+    driver_path = get_chromedriver_path()
+    os.makedirs("data", exist_ok=True)
+    print("Extracting content of the pages...")
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(SEARCHES)))) as pool:
+        futures = {
+            pool.submit(scrape_one, driver_path, index, keyword, location): (keyword, location)
+            for index, (keyword, location) in enumerate(SEARCHES)
+        }
+        for future in as_completed(futures):
+            keyword, location = futures[future]
+            try:
+                html_content = future.result()
+                # Save the HTML content to a file for later scraping
+                # Short hash of the exact pair keeps names distinct when slugs collide (C++ vs C#)
+                slug = re.sub(r"\W+", "_", f"{keyword}_{location}").strip("_").lower()
+                slug += "_" + hashlib.blake2s(f"{keyword}\0{location}".encode("utf-8"), digest_size=4).hexdigest()
+                write_output(f"data/jobs_page_{slug}.html.gz", html_content)
+            except Exception as e:
+                print(f"Error: search for {keyword} in {location} failed: {e}")
+                continue
+            print(f"Extractition completed: {keyword} in {location}")
+
+    # Keep the browsers open for inspection only when asked to, so unattended runs exit
+    if os.getenv("INTERACTIVE", "0") in ("1", "true", "True"):
+        input()
+finally:
+    # Close every browser, including ones from workers that failed
+    for driver in drivers:
+        try:
+            driver.quit()
+        except WebDriverException as e:
+            # e.g. that Chrome already crashed; keep closing the rest
+            print(f"Warning: failed to close a browser: {e}")
@@ -1,72 +1,216 @@
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+from webdriver_manager.chrome import ChromeDriverManager
+import errno
 import json
-import time
 import os
+import re
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from urllib.parse import urlencode, urlparse
 from dotenv import load_dotenv
-from bs4 import BeautifulSoup
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 # Load environment variables from .env file
 load_dotenv()
 
-def load_cookies(driver: webdriver.Chrome):
-    with open("cookies.json", "r") as f:
+# Collects every job card's outerHTML, joined in the page so a single string crosses the WebDriver bridge
+JOB_CARDS_JS = """
+var elements = Array.from(document.querySelectorAll("[data-view-name='job-card']"));
+return elements.length > 0 ? elements.map(element => element.outerHTML).join('\\n') : null;
+"""
+
+DRIVER_CACHE_FILE = Path.home() / ".cache" / "linkedin_extractor" / "driver_path"
+
+# Default install locations for platforms where Chrome usually isn't on PATH
+CHROME_INSTALL_PATHS = [
+    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+    r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+]
+# Per-user Windows installs live under %LOCALAPPDATA% rather than Program Files
+if os.getenv("LOCALAPPDATA"):
+    CHROME_INSTALL_PATHS.append(os.path.join(os.getenv("LOCALAPPDATA"), "Google", "Chrome", "Application", "chrome.exe"))
+
+# Email address or phone number; used with fullmatch, and the phone form must end in a digit
+USERNAME_PATTERN = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+|\+?\d[\d\s-]{5,}\d")
+
+def find_chrome_binary():
+    chrome_bin = os.getenv("CHROME_BIN")
+    if chrome_bin:
+        return chrome_bin if os.path.exists(chrome_bin) else None
+    for name in ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome"):
+        path = shutil.which(name)
+        if path:
+            return path
+    for path in CHROME_INSTALL_PATHS:
+        if os.path.exists(path):
+            return path
+    return None
+
+def validate_credentials(username: str, password: str):
+    """Return an error message if the LinkedIn credentials are obviously malformed, otherwise None."""
+    if not username or not password:
+        return "LinkedIn credentials not found. Please set LINKEDIN_USERNAME and LINKEDIN_PASSWORD environment variables."
+    # Check the exact value that gets typed into the login form, surrounding whitespace included
+    if not USERNAME_PATTERN.fullmatch(username):
+        return "LINKEDIN_USERNAME must be the email address or phone number of your LinkedIn account, without surrounding spaces."
+    if len(password) < 6:
+        return "LINKEDIN_PASSWORD is too short to be a LinkedIn password."
+    return None
+
+def get_chrome_major_version(chrome_bin: str = None):
+    if not chrome_bin:
+        return None
+    if sys.platform == "win32":
+        # chrome.exe --version opens a browser window instead of printing; the installer
+        # keeps a folder named after the full version next to chrome.exe
+        try:
+            versions = [name for name in os.listdir(os.path.dirname(chrome_bin)) if re.fullmatch(r"\d+(\.\d+){3}", name)]
+        except OSError:
+            return None
+        if not versions:
+            return None
+        return max(versions, key=lambda v: tuple(map(int, v.split(".")))).split(".")[0]
+    try:
+        output = subprocess.run([chrome_bin, "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = re.search(r"(\d+)\.", output)
+    return match.group(1) if match else None
+
+def get_chromedriver_path():
+    # An explicit path always wins and skips webdriver-manager entirely
+    driver_path = os.getenv("CHROMEDRIVER_PATH")
+    if driver_path:
+        return driver_path
+
+    # Reuse the driver resolved on a previous run as long as Chrome hasn't been upgraded
+    chrome_version = get_chrome_major_version(find_chrome_binary())
+    if chrome_version and DRIVER_CACHE_FILE.exists():
+        cached_version, _, cached_path = DRIVER_CACHE_FILE.read_text().partition("\n")
+        if cached_version == chrome_version and os.path.exists(cached_path):
+            return cached_path
+
+    driver_path = ChromeDriverManager().install()
+    if chrome_version:
+        DRIVER_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        DRIVER_CACHE_FILE.write_text(f"{chrome_version}\n{driver_path}")
+    return driver_path
+
+def wait(driver: webdriver.Chrome, timeout: float = 15):
+    # Poll every 100ms rather than WebDriverWait's default 500ms; going much lower just spams chromedriver
+    return WebDriverWait(driver, timeout, poll_frequency=0.1, ignored_exceptions=(StaleElementReferenceException,))
+
+def lock_profile_dir(profile_dir: str):
+    """Take an exclusive, non-blocking lock on a Chrome user-data-dir.
+    Returns the open lock file (keep it alive to hold the lock), or None if another process or worker owns it.
+    """
+    os.makedirs(profile_dir, exist_ok=True)
+    lock_file = open(profile_dir + ".lock", "w")
+    try:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError as e:
+        lock_file.close()
+        # Only contention means "taken"; anything else (e.g. ENOLCK on NFS) is a real error
+        if isinstance(e, BlockingIOError) or (not fcntl and e.errno in (errno.EACCES, errno.EDEADLOCK)):
+            return None
+        raise
+    return lock_file
+
+def load_cookies(driver: webdriver.Chrome, path: str = "cookies.json"):
+    with open(path, "r") as f:
         cookies = json.load(f)
         
     valid_keys = ['name', 'value', 'path', 'domain', 'secure', 'httpOnly', 'expiry', 'sameSite']
+    host = urlparse(driver.current_url).hostname or ""
 
     for cookie in cookies:
         # Filter the dictionary to only supported keys
         cleaned_cookie = {k: cookie[k] for k in cookie if k in valid_keys}
+        # Skip cookies for other hosts (e.g. .licdn.com) locally instead of a failing add_cookie round-trip
+        domain = cleaned_cookie.get('domain', '').lstrip('.')
+        if domain and host != domain and not host.endswith('.' + domain):
+            continue
         if 'expiry' in cleaned_cookie:
             cleaned_cookie['expiry'] = int(cleaned_cookie['expiry'])
         if 'sameSite' not in cleaned_cookie or cleaned_cookie['sameSite'] not in ['Strict', 'Lax', 'None']:
             cleaned_cookie['sameSite'] = 'Lax'
-        driver.add_cookie(cleaned_cookie)
+        try:
+            driver.add_cookie(cleaned_cookie)
+        except WebDriverException:
+            # Skip stale or otherwise rejected cookies rather than aborting the whole load
+            continue
 
     return driver
 
-def search_jobs(driver: webdriver.Chrome, keyword="Python Developer", location="United States"):
-    driver.get("https://www.linkedin.com/jobs")
-    time.sleep(3)
+def save_cookies(driver: webdriver.Chrome, path: str = "cookies.json"):
+    # Write to a temp file and swap it in so workers reading the cookies never see a partial file
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(driver.get_cookies(), f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def is_logged_in(driver: webdriver.Chrome, timeout: float = 5) -> bool:
+    try:
+        wait(driver, timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "nav.global-nav"))
+        )
+        return True
+    except TimeoutException:
+        return False
 
-    job_search_input = driver.find_element(By.CSS_SELECTOR, "input[componentkey='jobSearchBox']")
-    job_search_input.clear()
-    job_search_input.send_keys(keyword)
-    job_search_input.send_keys(Keys.RETURN)
+def insert_text(driver: webdriver.Chrome, element, text: str):
+    # One CDP message for the whole string instead of a key event per character
+    element.click()
+    driver.execute_cdp_cmd("Input.insertText", {"text": text})
+
+def jobs_search_url(keyword="Python Developer", location="United States"):
+    # The jobs search box only takes keywords, so put both filters in the results page URL
+    query = {"keywords": keyword}
+    if location:
+        query["location"] = location
+    return f"https://www.linkedin.com/jobs/search/?{urlencode(query)}"
+
+def search_jobs(driver: webdriver.Chrome, keyword="Python Developer", location="United States"):
+    driver.get(jobs_search_url(keyword, location))
 
 
 def linkedin_login(driver: webdriver.Chrome, username: str = None, password: str = None):
     username = username or os.getenv("LINKEDIN_USERNAME")
     password = password or os.getenv("LINKEDIN_PASSWORD")
     
-    if not username or not password:
-        raise ValueError("LinkedIn credentials not found. Please set LINKEDIN_USERNAME and LINKEDIN_PASSWORD environment variables.")
-    
-    time.sleep(2)
-    username_input = driver.find_element(By.ID, "username")
+    credentials_error = validate_credentials(username, password)
+    if credentials_error:
+        raise ValueError(credentials_error)
+
+    username_input = wait(driver).until(
+        EC.presence_of_element_located((By.ID, "username"))
+    )
     password_input = driver.find_element(By.ID, "password")
 
-    username_input.send_keys(username)
-    time.sleep(2)
-    password_input.send_keys(password)
-    time.sleep(0.5)
+    insert_text(driver, username_input, username)
+    insert_text(driver, password_input, password)
     password_input.send_keys(Keys.RETURN)
 
 def get_jobs_page_html(driver: webdriver.Chrome):
-    
-    js_code = """
-function getElementsByAttributeValue(attribute, value) {
-  return Array.from(document.querySelectorAll(`[${attribute}='${value}']`))
-              .map(element => element.outerHTML);
-}
-
-var elements = getElementsByAttributeValue('data-view-name', 'job-card');
-return elements.length > 0 ? elements : null;
-
-    """
-    element_html = driver.execute_script(js_code)
+    element_html = driver.execute_script(JOB_CARDS_JS)
     if element_html:
         return element_html
     return None